@@ -15,18 +15,24 @@ LangGraphのToolNodeで使用します。
 """
 
 import asyncio
-from contextlib import asynccontextmanager
+from contextlib import AsyncExitStack
+from typing import Literal
 
 from langchain_aws import ChatBedrockConverse
-from langchain_core.messages import HumanMessage
 from langchain_core.tools import BaseTool
 from langchain_mcp_adapters.tools import load_mcp_tools
-from langgraph.graph import START, MessagesState, StateGraph
+from langgraph.graph import END, START, MessagesState, StateGraph
 from langgraph.graph.state import CompiledStateGraph
-from langgraph.prebuilt import ToolNode, tools_condition
+from langgraph.prebuilt import ToolNode
+from langgraph.types import Command
 from mcp import ClientSession
 from mcp.client.streamable_http import streamablehttp_client
 
+try:
+    import uvloop
+except ImportError:  # uvloop は任意（Windows では利用できない）
+    uvloop = None
+
 from utils import print_messages
 
 # =============================================================================
@@ -35,20 +41,56 @@ from utils import print_messages
 
 
 class MCPClientManager:
-    """MCPサーバーとの接続を管理するクラス"""
+    """MCPサーバーとの接続を管理するクラス
+
+    一度初期化したセッションを保持し、複数回のグラフ実行で使い回します。
+    接続と切断は同じタスクで行う必要があるため、`async with` で使用します。
+    """
 
     def __init__(self, base_url: str = "http://localhost:8000/mcp"):
         self.base_url = base_url
         self.session: ClientSession | None = None
-
-    @asynccontextmanager
-    async def connect(self):
-        """MCPサーバーに接続（Streamable HTTP）"""
-        async with streamablehttp_client(self.base_url) as (read, write, _):
-            async with ClientSession(read, write) as session:
-                await session.initialize()
-                self.session = session
-                yield session
+        self._tools_cache: list[BaseTool] | None = None
+        self._stack = AsyncExitStack()
+
+    async def __aenter__(self) -> ClientSession:
+        return await self.connect()
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def connect(self) -> ClientSession:
+        """MCPサーバーに接続（Streamable HTTP、接続済みの場合はそのセッションを返す）"""
+        if self.session is not None:
+            return self.session
+        async with AsyncExitStack() as stack:
+            read, write, _ = await stack.enter_async_context(
+                streamablehttp_client(self.base_url)
+            )
+            session = await stack.enter_async_context(ClientSession(read, write))
+            await session.initialize()
+            # 初期化に成功した場合のみ、接続を保持する
+            self._stack = stack.pop_all()
+        self.session = session
+        return session
+
+    def get_session(self) -> ClientSession:
+        """初期化済みのセッションを返す"""
+        if self.session is None:
+            raise RuntimeError("MCPサーバーに接続されていません")
+        return self.session
+
+    async def get_tools(self) -> list[BaseTool]:
+        """LangChainのツールを返す（セッションごとに一度だけ読み込む）"""
+        if self._tools_cache is None:
+            self._tools_cache = await load_mcp_tools(self.get_session())
+        return self._tools_cache
+
+    async def aclose(self) -> None:
+        """セッションと接続を閉じる"""
+        await self._stack.aclose()
+        self.session = None
+        self._tools_cache = None
 
 
 mcp_manager = MCPClientManager()
@@ -67,11 +109,14 @@ llm = ChatBedrockConverse(
 def create_graph(tools: list[BaseTool]) -> CompiledStateGraph:
     llm_with_tools = llm.bind_tools(tools)
 
-    async def call_model(state: MessagesState) -> dict:
-        """非同期でLLMを呼び出す"""
+    async def call_model(
+        state: MessagesState,
+    ) -> Command[Literal["tools", "__end__"]]:
+        """非同期でLLMを呼び出し、ツール呼び出しの有無で遷移先を決める"""
         messages = state["messages"]
         response = await llm_with_tools.ainvoke(messages)
-        return {"messages": [response]}
+        goto = "tools" if response.tool_calls else END
+        return Command(update={"messages": [response]}, goto=goto)
 
     workflow = StateGraph(MessagesState)
 
@@ -79,21 +124,42 @@ def create_graph(tools: list[BaseTool]) -> CompiledStateGraph:
     workflow.add_node("tools", ToolNode(tools))
 
     workflow.add_edge(START, "agent")
-    workflow.add_conditional_edges("agent", tools_condition)
     workflow.add_edge("tools", "agent")
 
     return workflow.compile()
 
 
+_graph_cache: tuple[list[BaseTool], CompiledStateGraph] | None = None
+
+
+def get_graph(tools: list[BaseTool]) -> CompiledStateGraph:
+    """ツールのリストに対応するコンパイル済みのグラフを返す
+
+    ツールは読み込み元のセッションを保持しているため、
+    同じリストオブジェクトが渡された場合のみキャッシュを使います。
+    """
+    global _graph_cache
+    if _graph_cache is None or _graph_cache[0] is not tools:
+        _graph_cache = (tools, create_graph(tools))
+    return _graph_cache[1]
+
+
 async def main() -> None:
-    async with mcp_manager.connect():
-        tools = await load_mcp_tools(mcp_manager.session)
-        graph = create_graph(tools)
+    async with mcp_manager:
+        tools = await mcp_manager.get_tools()
+        graph = get_graph(tools)
         result = await graph.ainvoke(
-            {"messages": [HumanMessage(content="1.5と3の加算を行ってください。")]}
+            {
+                "messages": [
+                    {"role": "user", "content": "1.5と3の加算を行ってください。"}
+                ]
+            }
         )
         print_messages(result)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
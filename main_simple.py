@@ -1,5 +1,6 @@
+import functools
+
 from langchain_aws import ChatBedrockConverse
-from langchain_core.messages import HumanMessage
 from langgraph.graph import END, START, MessagesState, StateGraph
 from langgraph.graph.state import CompiledStateGraph
 
@@ -27,10 +28,15 @@ def create_graph() -> CompiledStateGraph:
     return workflow.compile()
 
 
+@functools.cache
+def get_graph() -> CompiledStateGraph:
+    """コンパイル済みのグラフを返す（初回のみコンパイルする）"""
+    return create_graph()
+
+
 def main() -> None:
-    graph = create_graph()
-    result = graph.invoke(
-        {"messages": [HumanMessage(content="1.5と3の加算を行ってください。")]}
+    result = get_graph().invoke(
+        {"messages": [{"role": "user", "content": "1.5と3の加算を行ってください。"}]}
     )
 
     print_messages(result)
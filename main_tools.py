@@ -1,14 +1,23 @@
+import functools
 import operator
+from typing import Literal
 
 from langchain_aws import ChatBedrockConverse
-from langchain_core.messages import HumanMessage
 from langchain_core.tools import tool
 from langgraph.graph import END, START, MessagesState, StateGraph
 from langgraph.graph.state import CompiledStateGraph
-from langgraph.prebuilt import ToolNode, tools_condition
+from langgraph.prebuilt import ToolNode
+from langgraph.types import Command
 
 from utils import print_messages
 
+_OPS = {
+    "add": (operator.add, "+"),
+    "subtract": (operator.sub, "-"),
+    "multiply": (operator.mul, "*"),
+    "divide": (operator.truediv, "/"),
+}
+
 
 # 計算ツールを定義
 @tool
@@ -22,22 +31,16 @@ def calculate(operation: str, a: float, b: float) -> str:
         str: 計算結果またはエラーメッセージ
     """
 
-    ops = {
-        "add": (operator.add, "+"),
-        "subtract": (operator.sub, "-"),
-        "multiply": (operator.mul, "*"),
-        "divide": (operator.truediv, "/"),
-    }
-
-    if operation not in ops:
+    entry = _OPS.get(operation)
+    if entry is None:
         return f"Error: Unknown operation '{operation}'"
 
-    func, symbol = ops[operation]
+    func, symbol = entry
 
-    if operation == "divide" and b == 0:
+    try:
+        result = func(a, b)
+    except ZeroDivisionError:
         return "Error: Division by zero"
-
-    result = func(a, b)
     return f"Result: {a} {symbol} {b} = {result}"
 
 
@@ -51,10 +54,12 @@ llm = ChatBedrockConverse(
 llm_with_tools = llm.bind_tools(tools)  # LLMの呼び出し時にツールの情報を渡す
 
 
-def call_model(state: MessagesState) -> dict:
+def call_model(state: MessagesState) -> Command[Literal["tools", "__end__"]]:
     messages = state["messages"]
     response = llm_with_tools.invoke(messages)
-    return {"messages": [response]}
+    # LLM がツールを呼ぶ必要があると判断したら ToolNode に遷移
+    goto = "tools" if response.tool_calls else END
+    return Command(update={"messages": [response]}, goto=goto)
 
 
 def create_graph() -> CompiledStateGraph:
@@ -64,20 +69,20 @@ def create_graph() -> CompiledStateGraph:
     workflow.add_node("tools", ToolNode(tools))  # ToolNode を追加
 
     workflow.add_edge(START, "agent")
-    workflow.add_conditional_edges(  # add_conditional_edges で LLM がツールを呼ぶ必要があると判断したら ToolNode に遷移
-        "agent",
-        tools_condition,
-    )
     workflow.add_edge("tools", "agent")
-    workflow.add_edge("agent", END)
 
     return workflow.compile()
 
 
+@functools.cache
+def get_graph() -> CompiledStateGraph:
+    """コンパイル済みのグラフを返す（初回のみコンパイルする）"""
+    return create_graph()
+
+
 def main() -> None:
-    graph = create_graph()
-    result = graph.invoke(
-        {"messages": [HumanMessage(content="1.5と3の加算を行ってください。")]}
+    result = get_graph().invoke(
+        {"messages": [{"role": "user", "content": "1.5と3の加算を行ってください。"}]}
     )
 
     print_messages(result)
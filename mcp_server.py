@@ -1,8 +1,30 @@
 import operator
 
+import anyio
 from mcp.server.fastmcp import FastMCP  # Create MCP server instance
 
-mcp = FastMCP("Calculate", host="localhost", port="8000", debug=True, log_level="INFO")
+try:
+    import uvloop
+except ImportError:  # uvloop は任意（Windows では利用できない）
+    uvloop = None
+
+# 複数ワーカーで起動してもリクエストがどのプロセスでも処理できるよう、ステートレスにする
+mcp = FastMCP(
+    "Calculate",
+    host="localhost",
+    port="8000",
+    debug=True,
+    log_level="INFO",
+    stateless_http=True,
+)
+
+
+_OPS = {
+    "add": (operator.add, "+"),
+    "subtract": (operator.sub, "-"),
+    "multiply": (operator.mul, "*"),
+    "divide": (operator.truediv, "/"),
+}
 
 
 @mcp.tool()
@@ -16,24 +38,26 @@ def calculate(operation: str, a: float, b: float) -> str:
         str: 計算結果またはエラーメッセージ
     """
 
-    ops = {
-        "add": (operator.add, "+"),
-        "subtract": (operator.sub, "-"),
-        "multiply": (operator.mul, "*"),
-        "divide": (operator.truediv, "/"),
-    }
-
-    if operation not in ops:
+    entry = _OPS.get(operation)
+    if entry is None:
         return f"Error: Unknown operation '{operation}'"
 
-    func, symbol = ops[operation]
+    func, symbol = entry
 
-    if operation == "divide" and b == 0:
+    try:
+        result = func(a, b)
+    except ZeroDivisionError:
         return "Error: Division by zero"
-
-    result = func(a, b)
     return f"Result: {a} {symbol} {b} = {result}"
 
 
+# 複数プロセスで起動する場合はASGIアプリとして uvicorn から読み込む:
+#   uvicorn mcp_server:app --host localhost --port 8000 --workers $(nproc) --loop uvloop
+app = mcp.streamable_http_app()
+
+
 if __name__ == "__main__":
-    mcp.run(transport="streamable-http")
+    if uvloop is not None:
+        anyio.run(mcp.run_streamable_http_async, backend_options={"use_uvloop": True})
+    else:
+        mcp.run(transport="streamable-http")
@@ -1,30 +1,51 @@
+import sys
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+
+
+def _fmt_human(i: int, msg: HumanMessage, parts: list[str]) -> None:
+    parts.append(f"\n[{i}] Human:")
+    parts.append(f"    {msg.content}")
+
+
+def _fmt_ai(i: int, msg: AIMessage, parts: list[str]) -> None:
+    parts.append(f"\n[{i}] AI:")
+    if msg.content:
+        parts.append(f"    Content: {msg.content}")
+    if msg.tool_calls:
+        parts.append("    Tool Calls:")
+        for tool_call in msg.tool_calls:
+            parts.append(
+                f"      - {tool_call.get('name', 'unknown')}({tool_call.get('args', {})})"
+            )
+
+
+def _fmt_tool(i: int, msg: ToolMessage, parts: list[str]) -> None:
+    parts.append(f"\n[{i}] Tool:")
+    parts.append(f"    Name: {msg.name}")
+    parts.append(f"    Result: {msg.content}")
+
+
+def _fmt_default(i: int, msg: BaseMessage, parts: list[str]) -> None:
+    parts.append(f"\n[{i}] ❓ {type(msg).__name__}:")
+    parts.append(f"    {msg}")
+
+
+_HANDLERS = {
+    HumanMessage: _fmt_human,
+    AIMessage: _fmt_ai,
+    ToolMessage: _fmt_tool,
+}
+
+
 def print_messages(result: dict) -> None:
     """メッセージを人間にとってわかりやすく出力する"""
     messages = result.get("messages", [])
+    parts: list[str] = []
 
     for i, msg in enumerate(messages, 1):
-        msg_type = type(msg).__name__
-
-        if msg_type == "HumanMessage":
-            print(f"\n[{i}] Human:")
-            print(f"    {msg.content}")
-
-        elif msg_type == "AIMessage":
-            print(f"\n[{i}] AI:")
-            if msg.content:
-                print(f"    Content: {msg.content}")
-            if hasattr(msg, "tool_calls") and msg.tool_calls:
-                print("    Tool Calls:")
-                for tool_call in msg.tool_calls:
-                    print(
-                        f"      - {tool_call.get('name', 'unknown')}({tool_call.get('args', {})})"
-                    )
-
-        elif msg_type == "ToolMessage":
-            print(f"\n[{i}] Tool:")
-            print(f"    Name: {msg.name if hasattr(msg, 'name') else 'unknown'}")
-            print(f"    Result: {msg.content}")
-
-        else:
-            print(f"\n[{i}] ❓ {msg_type}:")
-            print(f"    {msg}")
+        _HANDLERS.get(type(msg), _fmt_default)(i, msg, parts)
+
+    if parts:
+        sys.stdout.write("\n".join(parts) + "\n")
+        sys.stdout.flush()